@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Check that models built without validation match validated models.
+
+Compares BaseModel.construct_deep() with full validation for saved API
+responses (e.g. created with --format json), for instance after regenerating
+the model classes.
+"""
+import argparse
+import importlib
+import json
+import sys
+from pathlib import Path
+
+MODELS = {
+    "publications": ("freidok_cli.models.publications", "Publications"),
+    "institutions": ("freidok_cli.models.institutions", "Institutions"),
+}
+
+
+def arguments():
+    argp = argparse.ArgumentParser(
+        prog="check-models",
+        description=__doc__,
+    )
+
+    argp.add_argument("model", choices=MODELS, help="Model of the API responses")
+    argp.add_argument("files", nargs="+", type=Path, help="API response JSON file(s)")
+
+    return argp.parse_args()
+
+
+def main():
+    args = arguments()
+
+    module, name = MODELS[args.model]
+    model = getattr(importlib.import_module(module), name)
+
+    failed = False
+    for file in args.files:
+        data = json.loads(file.read_text(encoding="utf-8"))
+        if model.construct_deep(data).dict() == model(**data).dict():
+            print(f"{file}: ok")
+        else:
+            print(f"{file}: construct_deep() differs from validation", file=sys.stderr)
+            failed = True
+
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
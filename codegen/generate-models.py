@@ -3,16 +3,16 @@
 Generate Python code (Pydantic model classes) from JSON Schema.
 """
 import argparse
-import shlex
-import subprocess
 import sys
+from pathlib import Path
+from urllib.parse import urlparse
 
 FREIDOK_SCHEMA_PUB = (
     "https://freidok.uni-freiburg.de/site/interfaces?dl=schema_publications"
 )
 
-CMD_NOT_FOUND_MSG = """
-Error: {cmd} cannot be found.
+MODULE_NOT_FOUND_MSG = """
+Error: {module} cannot be found.
 
 Install with
      poetry install --with dev
@@ -36,53 +36,51 @@ def arguments():
 def main():
     args = arguments()
 
+    try:
+        from datamodel_code_generator import (
+            DataModelType,
+            Error,
+            InputFileType,
+            PythonVersion,
+            generate,
+        )
+    except ImportError:
+        msg = MODULE_NOT_FOUND_MSG.format(module="datamodel-code-generator").strip()
+        print(msg, file=sys.stderr)
+        exit(1)
+
     # base class for all generated models
     base_class = "freidok_cli.models.base.BaseModel"
 
     source = args.schema or FREIDOK_SCHEMA_PUB
 
     if source.startswith(("http:", "https:")):
-        source = f'--url "{source}"'
+        source = urlparse(source)
     else:
-        source = f'--input "{source}"'
-
-    cmdstr = f"""
-        datamodel-codegen
-        --use-schema-description
-        --use-field-description
-        --target-python-version 3.10
-        --use-double-quotes
-        --use-standard-collections
-        --encoding utf-8
-        --allow-extra-fields
-        --use-annotated
-        --force-optional
-        --input-file-type jsonschema
-        --output-model-type pydantic.BaseModel
-        --base-class {base_class}
-        --output {args.outfile}
-        {source}
-    """
-
-    cmd = shlex.split(cmdstr)
+        source = Path(source)
 
     try:
-        process = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
+        generate(
+            source,
+            input_file_type=InputFileType.JsonSchema,
+            output=Path(args.outfile),
+            output_model_type=DataModelType.PydanticBaseModel,
+            target_python_version=PythonVersion.PY_310,
+            base_class=base_class,
+            use_schema_description=True,
+            use_field_description=True,
+            use_double_quotes=True,
+            use_standard_collections=True,
+            encoding="utf-8",
+            allow_extra_fields=True,
+            use_annotated=True,
+            field_constraints=True,
+            force_optional_for_required_fields=True,
         )
-    except FileNotFoundError:
-        msg = CMD_NOT_FOUND_MSG.format(cmd=cmd[0]).strip()
-        print(msg, file=sys.stderr)
+    except Error as e:
+        print(f"datamodel-code-generator returned an error: {e}", file=sys.stderr)
         exit(1)
 
-    print(process.stdout)
-    if process.returncode:
-        print(f"{cmd[0]} returned an error")
-    exit(process.returncode)
-
 
 if __name__ == "__main__":
     main()
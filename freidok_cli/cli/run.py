@@ -1,26 +1,18 @@
+import atexit
+import functools
 import json
+import os
 import sys
 import warnings
 from enum import Enum
 
-from dotenv import load_dotenv
-from pydantic import ValidationError
-
-from freidok_cli import modify
 from freidok_cli.cli import options
-from freidok_cli.client import FreidokApiClient, FreidokFileReader
-from freidok_cli.export import (
-    InstitutionsHtmlExporter,
-    InstitutionsMarkdownExporter,
-    PublicationsHtmlExporter,
-    PublicationsMarkdownExporter,
-    TemplateExporter,
-)
-from freidok_cli.models.institutions import Institutions
-from freidok_cli.models.publications import Publications
 from freidok_cli.utils import opens
 from freidok_cli.version import __version__
 
+# heavy dependencies (pydantic, jinja2, requests, dotenv) are imported locally,
+# so that --help and usage errors don't pay for them
+
 USER_AGENT = f"freidok-cli/{__version__}"
 
 
@@ -31,12 +23,30 @@ class ExportFormat(str, Enum):
     TEMPLATE = "template"
 
 
-def main():
-    load_dotenv()
+# output formats by file extension (default: markdown)
+OUTFILE_FORMATS = {
+    ".htm": ExportFormat.HTML,
+    ".html": ExportFormat.HTML,
+    ".json": ExportFormat.JSON,
+}
+
+
+def main(argv: list[str] = None):
+    """
+    Run the command line interface.
+
+    Pass argv (defaults to sys.argv[1:]) to run several commands within one
+    process, e.g. from a script, without paying the startup cost per command:
+
+        >>> for pers_id in ("100", "1034"):
+        ...     main(["publ", "--pers-id", pers_id, "--out", f"{pers_id}.html"])
+    """
+    load_env()
 
     args = options.arguments(
         func_institutions=get_institutions,
         func_publications=get_publications,
+        argv=argv,
     )
 
     with warnings.catch_warnings(record=True) as caught_warnings:
@@ -44,18 +54,30 @@ def main():
 
         try:
             args.func(args)
-        except ValidationError as e:
-            print(
-                "Error: FreiDok API response doesn't match the expected format "
-                f"for '{e.model.__name__}'\n",
-                file=sys.stderr,
-            )
+        except Exception as e:
+            # validation errors can only occur if pydantic has been imported
+            pydantic = sys.modules.get("pydantic")
+            if pydantic and isinstance(e, pydantic.ValidationError):
+                print(
+                    "Error: FreiDok API response doesn't match the expected format "
+                    f"for '{e.model.__name__}'\n",
+                    file=sys.stderr,
+                )
             raise
 
         for warn in caught_warnings:
             print(f"{warn.category.__name__}: {warn.message}", file=sys.stderr)
 
 
+def load_env():
+    """Load environment variables from .env file (or FREIDOK_DOTENV), if present"""
+    dotenv_path = os.getenv("FREIDOK_DOTENV", ".env")
+    if os.path.isfile(dotenv_path):
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path)
+
+
 def get_output_format(args):
     # template argument overrides any other format argument
     if args.template:
@@ -65,30 +87,68 @@ def get_output_format(args):
         return args.format
 
     if args.out:
-        match args.out.suffix.lower():
-            case (".htm" | ".html"):
-                return ExportFormat.HTML
-            case ".json":
-                return ExportFormat.JSON
-            case _:
-                return ExportFormat.MARKDOWN
+        return OUTFILE_FORMATS.get(args.out.suffix.lower(), ExportFormat.MARKDOWN)
 
     return ExportFormat.MARKDOWN
 
 
 def create_freidok_client(args):
+    from freidok_cli.client import FreidokFileReader
+
     if args.source.startswith("http"):
-        return FreidokApiClient(
-            base_url=args.source,
-            user_agent=USER_AGENT,
-            dryrun=args.dryrun,
-            default_max_items=args.maxitems,
+        return create_api_client(
+            args.source, args.dryrun, args.maxitems, not args.no_cache
         )
     else:
         return FreidokFileReader(file=args.source)
 
 
+@functools.cache
+def create_api_client(
+    base_url: str, dryrun: bool, default_max_items: int, cache: bool = True
+):
+    """Return API client, shared by repeated main() calls (keeps connections)"""
+    from freidok_cli.client import FreidokApiClient
+
+    client = FreidokApiClient(
+        base_url=base_url,
+        user_agent=USER_AGENT,
+        dryrun=dryrun,
+        default_max_items=default_max_items,
+        cache=cache,
+    )
+    atexit.register(client.session.close)
+    return client
+
+
+@functools.cache
+def publications_model():
+    """Import and return the Publications model class (once)"""
+    from freidok_cli.models.publications import Publications
+
+    return Publications
+
+
+def build_model(cls, data: dict, validate=False):
+    """
+    Create model instance from API data.
+
+    API data is trusted by default, so the model is built without validation
+    unless validate is set.
+
+    :param cls: Model class
+    :param data: API response data
+    :param validate: Validate data while creating the model
+    :return: Model instance
+    """
+    if validate:
+        return cls(**data)
+    return cls.construct_deep(data)
+
+
 def get_publications(args):
+    from freidok_cli import modify
+
     client = create_freidok_client(args)
 
     # year params
@@ -113,9 +173,10 @@ def get_publications(args):
     # sort params
     # todo: make sort parameters available on command line
     sortfields = []
-    if "publication_year" in fields:
+    fields_set = frozenset(fields)
+    if "publication_year" in fields_set:
         sortfields.append("publication_year+desc")
-    if "id" in fields:
+    if "id" in fields_set:
         sortfields.append("id+desc")
     if sortfields:
         params["sortfield"] = ",".join(sortfields)
@@ -138,10 +199,21 @@ def get_publications(args):
         **params,
     )
 
-    if args.langs != ["ALL"]:
+    # dry run, the request has only been printed
+    if data is None:
+        return
+
+    if args.langs and args.langs != ["ALL"]:
         data = modify.json_strip_languages(data, preferred=args.langs)
 
-    publist = Publications(**data)
+    # json is exported from raw data, so skip model creation and modifications
+    if get_output_format(args) == ExportFormat.JSON:
+        if args.validate:
+            publications_model()(**data)
+        export_json(data, args)
+        return
+
+    publist = build_model(publications_model(), data, validate=args.validate)
 
     if args.exclude_authors:
         modify.exclude_publications_by_author(publist, names=args.exclude_authors)
@@ -149,17 +221,17 @@ def get_publications(args):
     if args.exclude_titles:
         modify.exclude_publications_by_title(publist, titles=args.exclude_titles)
 
+    # abbreviate first, so author names are only abbreviated once
+    if args.authors_abbrev is not None:
+        modify.shorten_author_firstnames(publist, sep=args.authors_abbrev)
+
     # add pre-formatted authors list to each publication object (_extras_authors)
     modify.add_author_list_string(
         publist,
-        abbrev=args.authors_abbrev,
         reverse=args.authors_reverse,
         sep=args.authors_sep,
     )
 
-    if args.authors_abbrev:
-        modify.shorten_author_firstnames(publist, sep=args.authors_abbrev)
-
     # sort publication links by type
     modify.sort_links_by_type(publist, preferred=["doi"])
 
@@ -167,21 +239,42 @@ def get_publications(args):
 
 
 def get_institutions(args):
+    from freidok_cli import modify
+    from freidok_cli.models.institutions import Institutions
+
     client = create_freidok_client(args)
     data = client.get_institutions(
         ids=args.id,
         name=args.name,
     )
 
-    if args.langs != ["ALL"]:
+    # dry run, the request has only been printed
+    if data is None:
+        return
+
+    if args.langs and args.langs != ["ALL"]:
         data = modify.json_strip_languages(data, preferred=args.langs)
 
-    items = Institutions(**data)
+    if get_output_format(args) == ExportFormat.JSON:
+        if args.validate:
+            Institutions(**data)
+        export_json(data, args)
+        return
+
+    items = build_model(Institutions, data, validate=args.validate)
 
     export(items, data, args)
 
 
 def export(items, data, args):
+    from freidok_cli.export import (
+        InstitutionsHtmlExporter,
+        InstitutionsMarkdownExporter,
+        PublicationsHtmlExporter,
+        PublicationsMarkdownExporter,
+        TemplateExporter,
+    )
+
     outfile = args.out or "-"
     outfmt = get_output_format(args)
     match outfmt:
@@ -205,12 +298,27 @@ def export(items, data, args):
             TemplateExporter().export(items, outfile, template_file=args.template)
 
         case ExportFormat.JSON:
-            with opens(outfile, encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            export_json(data, args)
 
         case _:
             raise NotImplementedError(f"Unsupported format: {outfmt}")
 
 
+def export_json(data, args):
+    """Export raw (deserialized) API data as json, using orjson if available"""
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    outfile = args.out or "-"
+    if orjson:
+        with opens(outfile, mode="wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with opens(outfile, encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 if __name__ == "__main__":
     main()
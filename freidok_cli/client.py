@@ -1,13 +1,17 @@
-import abc
 import json
+import sys
 import warnings
-from typing import Any
-
-import requests
-from requests.utils import get_encoding_from_headers
+from typing import Any, Protocol, runtime_checkable
 
 from freidok_cli.utils import list2str
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# requests is imported by the API client only, local files don't need it
+
 
 def create_headers(user_agent=None, user_email=None, extra_headers=None):
     """Build HTTP header dictionary"""
@@ -25,36 +29,50 @@ def create_headers(user_agent=None, user_email=None, extra_headers=None):
     return headers
 
 
-def add_param(d: dict[str, Any], name: str, value: Any, overwrite=True) -> None:
-    """
-    Conditionally add single parameter to parameter dict.
+def params_dict(**params) -> dict[str, Any]:
+    """Build parameter dict from keyword arguments, ignoring None values"""
+    return {name: value for name, value in params.items() if value is not None}
+
 
-    None values are ignored, existing keys are ignored by default.
+@runtime_checkable
+class FreiDokReader(Protocol):
+    """Interface of FreiDok data sources"""
 
-    :param d: Parameter dictionary
-    :param name: Parameter name
-    :param value: Parameter value
-    :param overwrite: Overwrite values of existing keys.
+    endpoint: str
+
+    def get_publications(self, *args, **kwargs) -> dict:
+        ...
+
+    def get_institutions(self, *args, **kwargs) -> dict:
+        ...
+
+
+def create_session(cache=True):
     """
-    if d is not None and value is not None:
-        if overwrite:
-            d[name] = value
-        else:
-            d.setdefault(name, value)
+    Create requests session, with HTTP caching if requests-cache is installed.
 
+    Cached responses are revalidated according to the server's Cache-Control
+    and ETag/Last-Modified headers and expire after one hour.
 
-class FreiDokReader(metaclass=abc.ABCMeta):
-    @abc.abstractmethod
-    def __init__(self, endpoint: str):
-        self.endpoint = endpoint
+    :param cache: Enable response caching
+    """
+    if cache:
+        try:
+            import requests_cache
+        except ImportError:
+            pass
+        else:
+            return requests_cache.CachedSession(
+                cache_name="freidok",
+                backend="sqlite",
+                use_cache_dir=True,
+                expire_after=3600,
+                cache_control=True,
+            )
 
-    @abc.abstractmethod
-    def get_publications(self):
-        pass
+    import requests
 
-    @abc.abstractmethod
-    def get_institutions(self):
-        pass
+    return requests.Session()
 
 
 class FreidokApiClient(FreiDokReader):
@@ -66,6 +84,7 @@ class FreidokApiClient(FreiDokReader):
         extra_headers: dict[str, str] = None,
         default_max_items: int = 0,
         dryrun=False,
+        cache=True,
     ):
         """
         FreiDok API client.
@@ -76,6 +95,8 @@ class FreidokApiClient(FreiDokReader):
         :param extra_headers: Additional header values
         :param default_max_items: Default row limit
         :param dryrun: If set to true, print request but don't send anything
+            (requests return None)
+        :param cache: Cache responses on disk (requires requests-cache)
         """
         if not base_url:
             raise ValueError("Invalid Freidok API URL")
@@ -86,19 +107,45 @@ class FreidokApiClient(FreiDokReader):
         self.timeout = 30
         self.dryrun = dryrun
 
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # reuse connections across requests (keep-alive), retry on gateway errors
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session = create_session(cache)
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
     def _print_prep_request(self, req, encoding=None):
         """Print a prepared request"""
         if not encoding:
+            from requests.utils import get_encoding_from_headers
+
             encoding = get_encoding_from_headers(req.headers)
         if body := req.body:
             body = req.body.decode(encoding) if encoding else "<binary data>"
-        headers = "\n".join(["{}: {}".format(*hv) for hv in req.headers.items()])
-        print(f"{req.method} {req.path_url} HTTP/1.1")
-        print(headers)
+        headers = "\n".join(f"{k}: {v}" for k, v in req.headers.items())
+        text = f"{req.method} {req.path_url} HTTP/1.1\n{headers}\n"
         if body:
-            print()
-            print()
-            print(body)
+            text += f"\n\n{body}\n"
+        sys.stdout.write(text)
 
     def _get(self, url, params: dict[str, Any] = None):
         # set default max_rows value, is not already present
@@ -106,14 +153,16 @@ class FreidokApiClient(FreiDokReader):
             params.setdefault("maxRows", self.default_max_items)
 
         if self.dryrun:
+            import requests
+
             r = requests.Request("GET", url=url, headers=self.headers, params=params)
             self._print_prep_request(r.prepare())
-            exit()
+            return None
 
-        r = requests.get(url, headers=self.headers, params=params, timeout=self.timeout)
+        r = self.session.get(url, params=params, timeout=self.timeout)
         r.raise_for_status()
 
-        return r.json()
+        return orjson.loads(r.content) if orjson else r.json()
 
     def get_publications(
         self,
@@ -149,12 +198,13 @@ class FreidokApiClient(FreiDokReader):
         """
         url = self.endpoint + "/publications"
 
-        params = {}
-        add_param(params, "publicationId", list2str(ids))
-        add_param(params, "instId", list2str(inst_ids))
-        add_param(params, "persId", list2str(pers_ids))
-        add_param(params, "projId", list2str(proj_ids))
-        add_param(params, "titleSearch", title)
+        params = params_dict(
+            publicationId=list2str(ids),
+            instId=list2str(inst_ids),
+            persId=list2str(pers_ids),
+            projId=list2str(proj_ids),
+            titleSearch=title,
+        )
 
         # some parameters are required (for this client, at least)
         if not params:
@@ -163,22 +213,20 @@ class FreidokApiClient(FreiDokReader):
                 "ids, inst_ids, pers_ids, proj_ids, title"
             )
 
-        add_param(params, "field", list2str(fields))
-        add_param(params, "maxPers", maxpers)
-        if maxitems:
-            add_param(params, "maxRows", maxitems)
-        if startitem:
-            add_param(params, "start", startitem)
+        params |= params_dict(
+            field=list2str(fields),
+            maxPers=maxpers,
+            maxRows=maxitems or None,
+            start=startitem or None,
+        )
 
         # add date params
         if year_from and year_from > 0:
-            if year_to and year_to > 0:
-                if year_to < year_from:
-                    raise ValueError(f"Invalid date range {year_from}-{year_to}")
-            else:
-                year_to = year_from
-            add_param(params, "yearFrom", year_from)
-            add_param(params, "yearTo", year_to)
+            year_to = year_to if year_to and year_to > 0 else year_from
+            if year_to < year_from:
+                raise ValueError(f"Invalid date range {year_from}-{year_to}")
+            params["yearFrom"] = year_from
+            params["yearTo"] = year_to
 
         if kwargs:
             params.update(kwargs)
@@ -187,9 +235,7 @@ class FreidokApiClient(FreiDokReader):
 
     def get_institutions(self, ids: list[int] = None, name: str = None, **kwargs):
         url = self.endpoint + "/institutions"
-        params = {}
-        add_param(params, "instId", list2str(ids))
-        add_param(params, "nameSearch", name)
+        params = params_dict(instId=list2str(ids), nameSearch=name)
         if not params:
             raise ValueError(
                 "Missing parameters! At least one of these parameters is required: "
@@ -217,8 +263,9 @@ class FreidokFileReader(FreiDokReader):
             warnings.warn(
                 "Some API filters/parameters cannot be applied to local files"
             )
-        with open(self.endpoint) as f:
-            return json.load(f)
+        with open(self.endpoint, "rb") as f:
+            data = f.read()
+        return orjson.loads(data) if orjson else json.loads(data)
 
     def get_institutions(self, *args, **kwargs):
         return self._get(*args, **kwargs)
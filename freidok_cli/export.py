@@ -1,5 +1,7 @@
 import abc
 import datetime
+import functools
+import hashlib
 from pathlib import Path
 
 import jinja2
@@ -11,6 +13,71 @@ from freidok_cli.utils import opens
 TFreidok = Publications | Institutions
 
 
+@functools.cache
+def _bytecode_cache(config: str) -> jinja2.BytecodeCache | None:
+    """
+    Return a cache for compiled templates in a user temp dir (None: disabled).
+
+    Jinja keys cached templates by name and file only, but compiled code
+    depends on environment options (e.g. autoescape), so each configuration
+    needs its own cache files.
+
+    :param config: Environment configuration identifier
+    """
+    digest = hashlib.sha1(config.encode()).hexdigest()[:16]
+    try:
+        return jinja2.FileSystemBytecodeCache(pattern=f"freidok_{digest}_%s.cache")
+    except (OSError, RuntimeError):
+        return None
+
+
+def _environment(
+    template_dir: str | None, environment_args: dict
+) -> jinja2.Environment:
+    """
+    Return a Jinja2 environment for a template directory (None: package).
+
+    Environments are shared if all environment arguments are hashable.
+    """
+    key = tuple(sorted(environment_args.items()))
+    try:
+        hash(key)
+    except TypeError:
+        # e.g. a list of extensions, don't cache
+        return _create_environment(template_dir, environment_args)
+    return _cached_environment(template_dir, key)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_environment(template_dir: str | None, environment_args: tuple):
+    """
+    Return a shared Jinja2 environment (environment_args as tuple of items).
+
+    Environments cache their compiled templates (reloading changed files), so
+    sharing them avoids parsing the same template again on every export.
+    """
+    return _create_environment(template_dir, dict(environment_args))
+
+
+def _create_environment(template_dir: str | None, environment_args: dict):
+    """
+    Create a Jinja2 environment for a template directory (None: package).
+
+    Compiled templates are also cached on disk for subsequent CLI runs.
+    """
+    environment_args = dict(environment_args)
+    if template_dir is None:
+        loader = jinja2.PackageLoader("freidok_cli", "templates")
+        # package templates don't change at runtime
+        environment_args.setdefault("auto_reload", False)
+    else:
+        loader = jinja2.FileSystemLoader(template_dir)
+    if "bytecode_cache" not in environment_args:
+        config = repr(sorted(environment_args.items()))
+        environment_args["bytecode_cache"] = _bytecode_cache(config)
+    return jinja2.Environment(loader=loader, **environment_args)
+
+
 class Exporter(metaclass=abc.ABCMeta):
     """
     Base class for FreiDok object exporters.
@@ -32,18 +99,12 @@ class TemplateExporter(Exporter):
 
     def _load_template(self, template_file: Path | None):
         """Load Jinja2 template from file"""
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_file.parent),
-            **self.environment_args,
-        )
+        env = _environment(str(template_file.parent), self.environment_args)
         return env.get_template(template_file.name)
 
     def _load_default_template(self):
         """Load Jinja2 template from our package"""
-        env = jinja2.Environment(
-            loader=jinja2.PackageLoader("freidok_cli", "templates"),
-            **self.environment_args,
-        )
+        env = _environment(None, self.environment_args)
         return env.get_template(self.default_template)
 
     def export(
@@ -65,7 +126,10 @@ class TemplateExporter(Exporter):
             raise ValueError("No template specified")
 
         with opens(outfile, mode="w", encoding="utf-8") as fout:
-            fout.write(template.render(context))
+            # stream output in chunks instead of rendering it into one string
+            stream = template.stream(context)
+            stream.enable_buffering(size=100)
+            stream.dump(fout)
 
 
 PublicationsHtmlExporter = TemplateExporter(
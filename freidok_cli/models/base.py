@@ -1,9 +1,68 @@
+from functools import cache
+
 import pydantic
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
 
 
 class BaseModel(pydantic.BaseModel):
-    @pydantic.validator('*', pre=True)
-    def empty_str_to_none(cls, v):
-        # if isinstance(v, str) and v == '':
-        #     return None
-        return v
+    @classmethod
+    def construct_deep(cls, data: dict):
+        """
+        Create model instance from trusted data without validation.
+
+        Like construct(), but nested models (and lists of models) are created,
+        too, so attribute access works throughout the object tree. Field
+        defaults must be immutable (true for all generated models).
+        """
+        defaults, aliases, nested = _model_info(cls)
+        values = defaults.copy()
+        fields_set = set()
+        for key, value in data.items():
+            if key in nested:
+                value = _construct_value(nested[key], value)
+            name = aliases.get(key, key)
+            values[name] = value
+            fields_set.add(name)
+
+        m = cls.__new__(cls)
+        object.__setattr__(m, '__dict__', values)
+        object.__setattr__(m, '__fields_set__', fields_set)
+        m._init_private_attributes()
+        return m
+
+
+def _field_model(field: ModelField):
+    """Return the model class contained in a field (possibly in lists), or None"""
+    if field.shape == SHAPE_SINGLETON:
+        model = field.type_
+        if isinstance(model, type) and issubclass(model, BaseModel):
+            return model
+    elif field.shape == SHAPE_LIST and field.sub_fields:
+        return _field_model(field.sub_fields[0])
+    return None
+
+
+@cache
+def _model_info(model: type[BaseModel]):
+    """
+    Return field defaults, field names by alias and fields containing nested
+    models (by alias) of a model class.
+    """
+    fields = model.__fields__
+    defaults = {name: f.default for name, f in fields.items() if not f.required}
+    aliases = {f.alias: name for name, f in fields.items() if f.alias != name}
+    nested = {f.alias: f for f in fields.values() if _field_model(f) is not None}
+    return defaults, aliases, nested
+
+
+def _construct_value(field: ModelField, value):
+    """Create nested model(s) for a field value without validation"""
+    if value is None:
+        return None
+    if field.shape == SHAPE_SINGLETON:
+        if isinstance(value, dict):
+            return field.type_.construct_deep(value)
+    elif isinstance(value, list):
+        sub_field = field.sub_fields[0]
+        return [_construct_value(sub_field, v) for v in value]
+    return value
@@ -1,6 +1,11 @@
-from typing import Sequence
+from __future__ import annotations
 
-from freidok_cli.models.publications import Publications, Person, Doc
+from functools import cache
+from typing import TYPE_CHECKING, Sequence
+
+# models are only needed for type hints, importing them is expensive
+if TYPE_CHECKING:
+    from freidok_cli.models.publications import Publications, Person, Doc
 
 
 def preference_index(value, preferred_values: list):
@@ -23,29 +28,65 @@ def preference_index(value, preferred_values: list):
         return len(preferred_values)
 
 
+def preference_ranks(preferred_values: Sequence) -> dict:
+    """
+    Return a dict mapping preferred values to their (first) list index.
+
+    Use ``ranks.get(value, len(preferred_values))`` as a constant-time
+    replacement for ``preference_index(value, preferred_values)``.
+
+    Example:
+        >>> items = [4, 7, 8, 2, 9, 1, 6]
+        >>> ranks = preference_ranks([1, 2, 3])
+        >>> sorted(items, key=lambda t: ranks.get(t, 3))
+        [1, 2, 4, 7, 8, 9, 6]
+    """
+    ranks = {}
+    for i, value in enumerate(preferred_values):
+        ranks.setdefault(value, i)
+    return ranks
+
+
 def json_strip_languages(node, attr="language", preferred=("eng", "deu", "ger")):
     """
     Recursively traverse a json dict and remove objects in non-preferred languages.
 
+    The data is modified in place and returned.
+
     :param node: Node in json dict tree
     :param attr: Sort lists with dict items having this key
-    :param preferred: Sequence of preferred languages
+    :param preferred: Sequence of preferred languages (empty: keep all)
     """
+    if not preferred:
+        return node
+
+    get_rank = preference_ranks(preferred).get
+    fallback = len(preferred)
+
+    def language_rank(item):
+        return get_rank(item[attr], fallback)
+
+    _strip_languages(node, attr, language_rank)
+    return node
+
+
+def _strip_languages(node, attr: str, key):
+    """Recursive part of json_strip_languages() taking the sort key function"""
     if isinstance(node, dict):
-        return {k: json_strip_languages(v, attr, preferred) for k, v in node.items()}
+        for value in node.values():
+            _strip_languages(value, attr, key)
     elif isinstance(node, list):
         # is a proper list of objects having a matching attribute?
         if len(node) > 1 and isinstance(node[0], dict) and attr in node[0]:
             # sort by language
-            node.sort(key=lambda x: preference_index(x[attr], preferred))
+            node.sort(key=key)
             # remove all but first item(s) (with the preferred language)
             k = 1
             while k < len(node) and node[k][attr] == node[0][attr]:
                 k += 1
-            node = node[0:k]
-        return [json_strip_languages(item, attr, preferred) for item in node]
-    else:
-        return node
+            del node[k:]
+        for item in node:
+            _strip_languages(item, attr, key)
 
 
 # def walk_dict_sort_by_attr(node, attr, sorter):
@@ -69,18 +110,27 @@ def json_strip_languages(node, attr="language", preferred=("eng", "deu", "ger"))
 
 def sort_links_by_type(publist: Publications, preferred: list[str]):
     """Sort specific publication links by type"""
+    get_rank = preference_ranks(preferred).get
+    fallback = len(preferred)
+
+    def link_rank(link):
+        return get_rank(link.type, fallback)
+
     for pub in publist.docs:
         # move preferred link types to beginning
         if pub.pub_ids:
-            pub.pub_ids.sort(key=lambda p: preference_index(p.type, preferred))
+            pub.pub_ids.sort(key=link_rank)
 
 
 def shorten_author_firstnames(publist: Publications, sep=""):
     """Shorten author first names"""
+    abbreviated = {}
     for pub in publist.docs:
         for pers in pub.persons:
-            if pers.forename:
-                pers.forename = _abbreviate(pers.forename, sep)
+            if forename := pers.forename:
+                if (short := abbreviated.get(forename)) is None:
+                    short = abbreviated[forename] = _abbreviate(forename, sep)
+                pers.forename = short
 
 
 def _abbreviate(name, sep=""):
@@ -88,35 +138,81 @@ def _abbreviate(name, sep=""):
     if not name:
         return ""
     else:
-        return sep.join(c[0].upper() for c in name.split()) + sep
+        return sep.join([c[0].upper() for c in name.split()]) + sep
 
 
-def get_author_name(author: Person, abbrev: str | None = None, reverse=False):
-    firstname = author.forename or ""
-    lastname = author.surname or ""
+@cache
+def author_name_formatter(abbrev: str | None = None, reverse=False):
+    """
+    Return a function formatting author names.
 
-    if abbrev is not None:
-        firstname = _abbreviate(firstname, sep=abbrev)
+    Options are resolved once, so the returned function is cheap to call
+    repeatedly (see get_author_name() for parameters).
+    """
+    if abbrev is None:
+
+        def firstname(author):
+            return author.forename or ""
+
+    else:
+
+        def firstname(author):
+            return _abbreviate(author.forename or "", sep=abbrev)
 
     if reverse:
-        name = f"{lastname} {firstname}"
+
+        def fmt(author):
+            return f"{author.surname or ''} {firstname(author)}".strip()
+
     else:
-        name = f"{firstname} {lastname}"
 
-    return name.strip()
+        def fmt(author):
+            return f"{firstname(author)} {author.surname or ''}".strip()
+
+    return fmt
+
+
+def get_author_name(author: Person, abbrev: str | None = None, reverse=False):
+    """
+    Return formatted author name.
+
+    :param author: Person
+    :param abbrev: Abbreviate first names with this separator (None: don't)
+    :param reverse: Put last name first
+    """
+    return author_name_formatter(abbrev, reverse)(author)
 
 
 def add_author_list_string(
     publist: Publications, abbrev: str | None = None, reverse=False, sep=None
 ):
-    """Add pre-formatted authors list as extra field"""
+    """
+    Add pre-formatted authors list as extra field.
+
+    Authors usually appear on many publications of a list, so each distinct
+    name is only formatted once.
+    """
     if sep is None:
         sep = ", "
+    fmt = author_name_formatter(abbrev, reverse)
+    names = {}
     for pub in publist.docs:
-        authors = [get_author_name(a, abbrev, reverse) for a in pub.persons]
+        authors = []
+        for a in pub.persons:
+            key = (a.forename, a.surname)
+            if (name := names.get(key)) is None:
+                name = names[key] = fmt(a)
+            authors.append(name)
         pub._extras_authors = sep.join(authors)
 
 
+def _lower_values(values: str | Sequence[str]) -> list[str]:
+    """Return one or many string values as list of lowercase strings"""
+    if isinstance(values, str):
+        values = [values]
+    return [v.lower() for v in values]
+
+
 def publication_has_author(pub: Doc, names: str | list[str]):
     """
     Return true if the author name(s) of a publication match any of the
@@ -128,15 +224,14 @@ def publication_has_author(pub: Doc, names: str | list[str]):
     :param names: One or many string values
     :return: True, if some author name matches, otherwise false
     """
-    if isinstance(names, str):
-        names = [names]
-    names = [p.lower() for p in names]
-    for pers in pub.persons:
-        name_value = get_author_name(pers)
-        for name in names:
-            if name in name_value.lower():
-                return True
-    return False
+    return _has_author(pub, _lower_values(names))
+
+
+def _has_author(pub: Doc, names: list[str]):
+    """Like publication_has_author(), with lowercase name values"""
+    # search all names at once (newlines don't occur in names or patterns)
+    haystack = "\n".join([get_author_name(pers) for pers in pub.persons]).lower()
+    return any(name in haystack for name in names)
 
 
 def publication_has_title(pub: Doc, titles: str | Sequence[str]):
@@ -150,14 +245,13 @@ def publication_has_title(pub: Doc, titles: str | Sequence[str]):
     :param titles: One or many string values
     :return: True, if some title matches, otherwise false
     """
-    if isinstance(titles, str):
-        titles = [titles]
-    titles = [t.lower() for t in titles]
-    for title_value in pub.titles:
-        for title in titles:
-            if title in title_value.value.lower():
-                return True
-    return False
+    return _has_title(pub, _lower_values(titles))
+
+
+def _has_title(pub: Doc, titles: list[str]):
+    """Like publication_has_title(), with lowercase title values"""
+    haystack = "\n".join([t.value for t in pub.titles if t.value]).lower()
+    return any(title in haystack for title in titles)
 
 
 def exclude_publications_by_author(publist: Publications, names: str | Sequence[str]):
@@ -168,11 +262,12 @@ def exclude_publications_by_author(publist: Publications, names: str | Sequence[
     :param names: One or many string values
     :return: List of publications
     """
+    names = _lower_values(names)
     # fmt: off
     publist.docs = [
         pub
         for pub in publist.docs
-        if not publication_has_author(pub, names)
+        if not _has_author(pub, names)
     ]
     # fmt: on
 
@@ -185,10 +280,11 @@ def exclude_publications_by_title(publist: Publications, titles: str | list[str]
     :param titles: One or many string values
     :return: List of publications
     """
+    titles = _lower_values(titles)
     # fmt: off
     publist.docs = [
         pub
         for pub in publist.docs
-        if not publication_has_title(pub, titles)
+        if not _has_title(pub, titles)
     ]
     # fmt: on
@@ -8,7 +8,9 @@ import sys
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, ConnectionError
+from urllib3.util.retry import Retry
 
 ENV_PREFIX = "PUSH_PLONE_"
 
@@ -79,6 +81,15 @@ class PlonePusher:
 
         self.login_path = "login_form"
         self.logout_path = "logout"
+        self.edit_path = "atct_edit"
+
+        # constant edit form fields, without 'filename=XXX' part in form-data
+        self.edit_form = {
+            "text_text_format": (None, "text/html"),
+            "language": (None, "en"),
+            "form.submitted": (None, "1"),
+            "form.button.save": (None, "Save"),
+        }
 
     def login(self, s: requests.Session):
         payload = {
@@ -109,19 +120,9 @@ class PlonePusher:
     def _send(self, s: requests.Session, remote_path: str, data: str):
         remote_path = remote_path.strip("/")
 
-        payload = {
-            "text": data,
-            "text_text_format": "text/html",
-            "language": "en",
-            "form.submitted": "1",
-            "form.button.save": "Save",
-        }
+        payload = {"text": (None, data), **self.edit_form}
 
-        # remove 'filename=XXX' part from form-data
-        for k, v in payload.items():
-            payload[k] = (None, v)
-
-        url = f"{self.base_url}/{remote_path}/atct_edit"
+        url = f"{self.base_url}/{remote_path}/{self.edit_path}"
         r = s.post(url, files=payload)
         r.raise_for_status()
 
@@ -131,8 +132,24 @@ class PlonePusher:
         if "require_login" in r.url:
             raise ValueError("Unauthorized")
 
+    def _session(self) -> requests.Session:
+        """Create session keeping one connection for login, edit and logout"""
+        # retry connection errors and gateway errors (not for POST requests),
+        # finally return the last response, so raise_for_status() raises
+        retry = Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+        s = requests.Session()
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        return s
+
     def push(self, remote_path: str, data: str):
-        with requests.Session() as s:
+        with self._session() as s:
             try:
                 self.login(s)
                 print("Login successful")
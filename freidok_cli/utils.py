@@ -5,10 +5,10 @@ from typing import Callable, TypeVar
 T = TypeVar("T")
 
 
-def list2str(items: list | None, sep: str = ",") -> str | None:
-    """Convert a list to a string"""
-    if items is None:
-        return None
+def list2str(items: list | str | None, sep: str = ",") -> str | None:
+    """Convert a list to a string (strings are returned as they are)"""
+    if items is None or isinstance(items, str):
+        return items
     else:
         return sep.join([str(item) for item in items])
 
@@ -21,14 +21,16 @@ def str2list(arg: str, mapper: Callable[[str], T] = str, sep: str = ",") -> list
 
 @contextlib.contextmanager
 def opens(file=None, mode="w", stream=sys.stdout, **kwargs):
-    """Open file for writing, otherwise use stream"""
+    """Open file for writing, otherwise use stream (or its buffer in binary mode)"""
     if file and file != "-":
         fh = open(file, mode, **kwargs)
+        close = True
     else:
-        fh = stream
+        fh = stream.buffer if "b" in mode else stream
+        close = False
 
     try:
         yield fh
     finally:
-        if fh is not stream:
+        if close:
             fh.close()